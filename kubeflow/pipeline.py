@@ -4,78 +4,146 @@ Kubeflow Pipeline: Demand Forecasting & Spend Impact
 
 This pipeline orchestrates the full ML workflow:
 1. Feature engineering
-2. Model training
-3. Prediction generation
+2. Cross-validation (+ CV analysis) and final model training, in parallel
+3. Per-country prediction generation, fanned out in parallel
 4. Financial impact analysis
 
-All steps wrap existing, tested Python scripts.
+Each step imports and calls the existing, tested module functions
+in-process. Intermediate datasets and the model artifact are passed
+between steps through the KFP artifact store.
 """
 
+import os
+from typing import List
+
 from kfp import dsl
-from kfp.dsl import component
+from kfp.dsl import Dataset, Input, Model, Output, component
+
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# Shared runtime image with all dependencies and `src/` baked in
+# (built from docker/Dockerfile). Resolved at compile time — release
+# builds should pin it by digest, e.g.
+#   PIPELINE_BASE_IMAGE=ghcr.io/<org>/demand-forecasting@sha256:<digest>
+BASE_IMAGE = os.environ.get("PIPELINE_BASE_IMAGE", "demand-forecasting:latest")
+
+# Upper bound on concurrently running per-country prediction pods
+MAX_PARALLEL_PREDICTIONS = 4
 
 
 # ============================================================
 # Pipeline Components
 # ============================================================
 
-@component(
-    base_image="python:3.9",
-    packages_to_install=["pandas", "numpy", "scikit-learn", "joblib"]
-)
-def feature_engineering_op():
+@component(base_image=BASE_IMAGE, install_kfp_package=False)
+def feature_engineering_op(
+    training_data: Input[Dataset],
+    features: Output[Dataset],
+):
     """Run feature engineering"""
-    import subprocess
+    from src.features.feature_engineering import run_feature_engineering
+
     print("🚀 Running feature engineering step")
-    subprocess.run(
-        ["python", "src/features/feature_engineering.py"],
-        check=True
+    run_feature_engineering(
+        input_path=training_data.path,
+        output_path=features.path,
     )
     print("✅ Feature engineering completed")
 
 
-@component(
-    base_image="python:3.9",
-    packages_to_install=["pandas", "numpy", "scikit-learn", "joblib"]
-)
-def train_baseline_model_op():
+@component(base_image=BASE_IMAGE, install_kfp_package=False)
+def cross_validate_op(
+    features: Input[Dataset],
+    cv_results: Output[Dataset],
+):
+    """Run TimeSeriesSplit cross-validation of the baseline model"""
+    from src.models.train_baseline import main
+
+    print("🚀 Cross-validating baseline model")
+    # Pods are ephemeral and KFP caches whole steps; skip the local
+    # fold-fit cache
+    main(
+        data_path=features.path,
+        output_path=cv_results.path,
+        use_cache=False,
+    )
+    print("✅ Cross-validation completed")
+
+
+@component(base_image=BASE_IMAGE, install_kfp_package=False)
+def analyze_cv_results_op(
+    cv_results: Input[Dataset],
+):
+    """Analyze baseline cross-validation results"""
+    from src.evaluation.analyze_baseline_cv_results import main
+
+    print("🚀 Analyzing cross-validation results")
+    main(cv_results_path=cv_results.path)
+    print("✅ Cross-validation analysis completed")
+
+
+@component(base_image=BASE_IMAGE, install_kfp_package=False)
+def train_final_op(
+    features: Input[Dataset],
+    model: Output[Model],
+):
     """Train final baseline model"""
-    import subprocess
+    from src.models.train_final_baseline import main
+
     print("🚀 Training final baseline model")
-    subprocess.run(
-        ["python", "src/models/train_final_baseline.py"],
-        check=True
+    # Pods are ephemeral and KFP caches whole steps; skip the local
+    # design-matrix cache
+    main(
+        features_path=features.path,
+        model_output_path=model.path,
+        use_cache=False,
     )
     print("✅ Model training completed")
 
 
-@component(
-    base_image="python:3.9",
-    packages_to_install=["pandas", "numpy", "scikit-learn", "joblib"]
-)
-def generate_predictions_op():
-    """Generate baseline predictions"""
-    import subprocess
-    print("🚀 Generating baseline predictions")
-    subprocess.run(
-        ["python", "src/models/generate_baseline_predictions.py"],
-        check=True
+@component(base_image=BASE_IMAGE, install_kfp_package=False)
+def list_countries_op(
+    features: Input[Dataset],
+) -> List[str]:
+    """List the distinct countries to fan prediction out over"""
+    from src.data_io import read_table
+
+    countries = read_table(features.path, columns=["COUNTRY"])["COUNTRY"]
+    return sorted(countries.unique().tolist())
+
+
+@component(base_image=BASE_IMAGE, install_kfp_package=False)
+def generate_predictions_op(
+    features: Input[Dataset],
+    model: Input[Model],
+    country: str,
+    predictions: Output[Dataset],
+):
+    """Generate baseline predictions for a single country"""
+    from src.models.generate_baseline_predictions import main
+
+    print(f"🚀 Generating baseline predictions for {country}")
+    main(
+        features_path=features.path,
+        model_path=model.path,
+        output_path=predictions.path,
+        country=country,
     )
     print("✅ Predictions generated")
 
 
-@component(
-    base_image="python:3.9",
-    packages_to_install=["pandas", "numpy"]
-)
-def financial_impact_op():
+@component(base_image=BASE_IMAGE, install_kfp_package=False)
+def financial_impact_op(
+    predictions: Input[List[Dataset]],
+):
     """Run financial impact analysis"""
-    import subprocess
+    from src.evaluation.spend_impact import main
+
     print("🚀 Running financial impact analysis")
-    subprocess.run(
-        ["python", "src/evaluation/spend_impact.py"],
-        check=True
-    )
+    main(predictions_path=[p.path for p in predictions])
     print("✅ Financial impact analysis completed")
 
 
@@ -87,15 +155,45 @@ def financial_impact_op():
     name="Demand Forecasting & Spend Impact Pipeline",
     description="End-to-end ML pipeline for demand forecasting and financial impact analysis"
 )
-def demand_forecasting_pipeline():
+def demand_forecasting_pipeline(training_data_uri: str):
 
-    feature_step = feature_engineering_op()
+    training_data = dsl.importer(
+        artifact_uri=training_data_uri,
+        artifact_class=Dataset,
+        reimport=False,
+    )
 
-    train_step = train_baseline_model_op().after(feature_step)
+    feature_step = feature_engineering_op(
+        training_data=training_data.output
+    )
 
-    predict_step = generate_predictions_op().after(train_step)
+    features = feature_step.outputs["features"]
 
-    impact_step = financial_impact_op().after(predict_step)
+    # CV and final training only depend on the features, so they run
+    # as sibling pods
+    cv_step = cross_validate_op(features=features)
+
+    cv_analysis_step = analyze_cv_results_op(
+        cv_results=cv_step.outputs["cv_results"]
+    )
+
+    train_step = train_final_op(features=features)
+
+    countries_step = list_countries_op(features=features)
+
+    with dsl.ParallelFor(
+        items=countries_step.output,
+        parallelism=MAX_PARALLEL_PREDICTIONS,
+    ) as country:
+        predict_step = generate_predictions_op(
+            features=features,
+            model=train_step.outputs["model"],
+            country=country,
+        )
+
+    impact_step = financial_impact_op(
+        predictions=dsl.Collected(predict_step.outputs["predictions"])
+    )
 
 
 # ============================================================
@@ -0,0 +1,223 @@
+"""
+Tabular I/O Helpers
+-------------------
+Shared read/write helpers for intermediate pipeline artifacts.
+
+- `.parquet` paths are handled by pyarrow (typed, columnar, compressed)
+- `.csv` paths are handled by pandas CSV
+- FAST_IO=1 switches the default artifact format to Parquet; CSV remains
+  the default so existing files and tooling keep working
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+
+# ============================================================
+# Configuration
+# ============================================================
+
+FAST_IO = os.environ.get("FAST_IO", "0") == "1"
+
+ARTIFACT_SUFFIX = ".parquet" if FAST_IO else ".csv"
+
+PARQUET_COMPRESSION = "zstd"
+PARQUET_ROW_GROUP_SIZE = 100_000
+DEFAULT_CHUNKSIZE = 250_000
+PARQUET_MAGIC = b"PAR1"
+CSV_BLOCK_SIZE = 1 << 22
+
+# Every date this pipeline reads or writes is ISO-8601; naming the format
+# skips pandas' per-file format inference when parsing CSV dates
+DATE_FORMAT = "ISO8601"
+
+
+# ============================================================
+# Format Detection
+# ============================================================
+
+def is_parquet(path: Path, sniff: bool = True) -> bool:
+    """
+    Resolve the format of `path`.
+
+    Suffix wins when present. Extension-less paths (e.g. KFP artifact
+    paths) are sniffed for the Parquet magic bytes when `sniff` is set
+    and the file exists, otherwise they follow FAST_IO.
+    """
+    path = Path(path)
+
+    if path.suffix == ".parquet":
+        return True
+    if path.suffix == ".csv":
+        return False
+
+    if sniff and path.is_file():
+        with open(path, "rb") as f:
+            return f.read(4) == PARQUET_MAGIC
+
+    return FAST_IO
+
+
+# ============================================================
+# Read / Write
+# ============================================================
+
+def read_columns(path: Path) -> List[str]:
+    """Column names of a CSV or Parquet artifact, without reading any rows"""
+    if is_parquet(path):
+        return pq.read_schema(path).names
+
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_table(
+    path: Path,
+    parse_dates: Optional[List[str]] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Load a CSV or Parquet artifact into a DataFrame"""
+    if is_parquet(path):
+        # Dtypes (incl. datetimes) are stored in the file, no re-parse.
+        # Memory-map the file and free each Arrow column as it is
+        # converted, so the data is never resident as Arrow + pandas
+        table = pq.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    return pd.read_csv(
+        path,
+        parse_dates=parse_dates,
+        date_format=DATE_FORMAT,
+        usecols=columns,
+        engine="pyarrow" if FAST_IO else "c",
+    )
+
+
+def read_arrow(
+    path: Path,
+    parse_dates: Optional[List[str]] = None,
+    columns: Optional[List[str]] = None,
+) -> pa.Table:
+    """
+    Load a CSV or Parquet artifact as an Arrow Table.
+
+    For callers that reorder or slice rows before converting to pandas:
+    Arrow compute (e.g. `Table.sort_by`) is multithreaded and avoids
+    building an intermediate DataFrame.
+    """
+    if is_parquet(path):
+        return pq.read_table(path, columns=columns, memory_map=True)
+
+    return pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=columns,
+            column_types={c: pa.timestamp("ns") for c in parse_dates or []},
+        ),
+    )
+
+
+def write_table(df: pd.DataFrame, path: Path):
+    """Persist a DataFrame as CSV or Parquet based on `path`"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if is_parquet(path, sniff=False):
+        df.to_parquet(
+            path,
+            index=False,
+            compression=PARQUET_COMPRESSION,
+            row_group_size=PARQUET_ROW_GROUP_SIZE,
+        )
+    else:
+        df.to_csv(path, index=False)
+
+
+# ============================================================
+# Chunked Read / Write
+# ============================================================
+
+def iter_table(
+    path: Path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    parse_dates: Optional[List[str]] = None,
+    columns: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Stream a CSV or Parquet artifact as DataFrames of <= chunksize rows"""
+    if is_parquet(path):
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+        return
+
+    # The pyarrow CSV engine does not support chunked reads
+    yield from pd.read_csv(
+        path,
+        parse_dates=parse_dates,
+        date_format=DATE_FORMAT,
+        usecols=columns,
+        chunksize=chunksize,
+    )
+
+
+class TableWriter:
+    """
+    Append chunks to a CSV or Parquet artifact.
+
+    Parquet chunks become row groups of a single file; CSV chunks are
+    appended without repeating the header. A chunk is a DataFrame or a
+    {column: array} dict — the latter goes straight to Arrow without
+    building an intermediate DataFrame.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.parquet = is_parquet(self.path, sniff=False)
+        self.rows_written = 0
+        self._writer = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, chunk: Union[pd.DataFrame, Dict[str, np.ndarray]]):
+        if self.parquet:
+            if isinstance(chunk, pd.DataFrame):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+            else:
+                table = pa.table(chunk)
+
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(
+                    self.path, table.schema, compression=PARQUET_COMPRESSION
+                )
+            self._writer.write_table(table.cast(self._writer.schema))
+            n_rows = table.num_rows
+        else:
+            df = pd.DataFrame(chunk, copy=False)
+            df.to_csv(
+                self.path,
+                index=False,
+                mode="w" if self.rows_written == 0 else "a",
+                header=self.rows_written == 0,
+            )
+            n_rows = len(df)
+
+        self.rows_written += n_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -8,7 +8,7 @@ Purpose:
 - Provide business-readable outputs
 
 Inputs:
-- data/processed/baseline_predictions.csv
+- data/processed/baseline_predictions.csv (.parquet with FAST_IO=1)
 
 Outputs:
 - Printed financial impact summary
@@ -21,13 +21,17 @@ Outputs:
 
 import pandas as pd
 import numpy as np
+import numexpr as ne
 from pathlib import Path
+from typing import Sequence, Union
+
+from src.data_io import ARTIFACT_SUFFIX, read_table
 
 # ============================================================
 # Configuration
 # ============================================================
 
-PREDICTIONS_PATH = Path("data/processed/baseline_predictions.csv")
+PREDICTIONS_PATH = Path(f"data/processed/baseline_predictions{ARTIFACT_SUFFIX}")
 
 # Financial assumptions (example – adjustable)
 REVENUE_PER_UNIT = 120.0        # revenue per unit sold
@@ -52,27 +56,33 @@ def compute_financial_impact(df: pd.DataFrame) -> pd.DataFrame:
 
     log("Computing forecast error")
 
-    df["FORECAST_ERROR"] = df["ACTUAL_DEMAND"] - df["BASELINE_PREDICTION"]
+    actual = df["ACTUAL_DEMAND"].to_numpy(dtype=np.float64)
+    predicted = df["BASELINE_PREDICTION"].to_numpy(dtype=np.float64)
+
+    err = ne.evaluate("actual - predicted")
 
-    # Positive error → under-forecast (missed demand)
-    df["UNDER_FORECAST_UNITS"] = df["FORECAST_ERROR"].clip(lower=0)
+    # Positive error → under-forecast (missed demand). `err != err` is
+    # the NaN test: a row without an actual stays NaN, not a perfect 0
+    under = ne.evaluate("where(err != err, err, where(err > 0, err, 0))")
 
     # Negative error → over-forecast (excess supply)
-    df["OVER_FORECAST_UNITS"] = (-df["FORECAST_ERROR"]).clip(lower=0)
+    over = ne.evaluate("where(err != err, err, where(err < 0, -err, 0))")
 
     log("Applying financial cost assumptions")
 
-    df["UNDER_FORECAST_COST_$"] = (
-        df["UNDER_FORECAST_UNITS"] * UNDER_FORECAST_COST
+    under_cost = ne.evaluate(
+        "under * cost", local_dict={"under": under, "cost": UNDER_FORECAST_COST}
     )
-
-    df["OVER_FORECAST_COST_$"] = (
-        df["OVER_FORECAST_UNITS"] * OVER_FORECAST_COST
+    over_cost = ne.evaluate(
+        "over * cost", local_dict={"over": over, "cost": OVER_FORECAST_COST}
     )
 
-    df["TOTAL_FORECAST_COST_$"] = (
-        df["UNDER_FORECAST_COST_$"] + df["OVER_FORECAST_COST_$"]
-    )
+    df["FORECAST_ERROR"] = err
+    df["UNDER_FORECAST_UNITS"] = under
+    df["OVER_FORECAST_UNITS"] = over
+    df["UNDER_FORECAST_COST_$"] = under_cost
+    df["OVER_FORECAST_COST_$"] = over_cost
+    df["TOTAL_FORECAST_COST_$"] = ne.evaluate("under_cost + over_cost")
 
     return df
 
@@ -80,17 +90,28 @@ def compute_financial_impact(df: pd.DataFrame) -> pd.DataFrame:
 # Main Execution
 # ============================================================
 
-def main():
+def main(
+    predictions_path: Union[Path, Sequence[Path]] = PREDICTIONS_PATH,
+):
 
     log("Starting forecast financial impact analysis")
 
+    # Accept a single file or the per-country shards from the pipeline
+    if isinstance(predictions_path, (str, Path)):
+        predictions_paths = [Path(predictions_path)]
+    else:
+        predictions_paths = [Path(p) for p in predictions_path]
+
     # --------------------------------------------------------
     # Load predictions
     # --------------------------------------------------------
 
     log("Loading baseline predictions")
 
-    df = pd.read_csv(PREDICTIONS_PATH, parse_dates=["DATE"])
+    df = pd.concat(
+        [read_table(p, parse_dates=["DATE"]) for p in predictions_paths],
+        ignore_index=True,
+    )
 
     log(f"Loaded predictions with shape: {df.shape}")
     log(f"Date range: {df['DATE'].min()} → {df['DATE'].max()}")
@@ -118,16 +139,23 @@ def main():
 
     log("Aggregating financial impact summary")
 
-    summary = {
-        "Total Actual Demand": df["ACTUAL_DEMAND"].sum(),
-        "Total Predicted Demand": df["BASELINE_PREDICTION"].sum(),
-        "Total Under-Forecast Units": df["UNDER_FORECAST_UNITS"].sum(),
-        "Total Over-Forecast Units": df["OVER_FORECAST_UNITS"].sum(),
-        "Total Under-Forecast Cost ($)": df["UNDER_FORECAST_COST_$"].sum(),
-        "Total Over-Forecast Cost ($)": df["OVER_FORECAST_COST_$"].sum(),
-        "Total Forecast Cost ($)": df["TOTAL_FORECAST_COST_$"].sum(),
+    # Report label → source column
+    summary_cols = {
+        "Total Actual Demand": "ACTUAL_DEMAND",
+        "Total Predicted Demand": "BASELINE_PREDICTION",
+        "Total Under-Forecast Units": "UNDER_FORECAST_UNITS",
+        "Total Over-Forecast Units": "OVER_FORECAST_UNITS",
+        "Total Under-Forecast Cost ($)": "UNDER_FORECAST_COST_$",
+        "Total Over-Forecast Cost ($)": "OVER_FORECAST_COST_$",
+        "Total Forecast Cost ($)": "TOTAL_FORECAST_COST_$",
     }
 
+    # One 2-D reduction instead of a separate sweep per column; nansum
+    # keeps Series.sum()'s skipna semantics for rows without actuals
+    totals = np.nansum(df[list(summary_cols.values())].to_numpy(dtype=np.float64), axis=0)
+
+    summary = dict(zip(summary_cols.keys(), totals))
+
     print("\n📊 FINANCIAL IMPACT SUMMARY")
     print("--------------------------------------------------")
 
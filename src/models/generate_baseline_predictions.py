@@ -9,7 +9,7 @@ Purpose:
 - Persist predictions for downstream financial impact analysis
 
 Design principles:
-- No re-fitting encoders
+- No re-fitting category mappings
 - Strict schema reuse from model artifact
 - Deterministic & reproducible inference
 """
@@ -21,15 +21,19 @@ Design principles:
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from typing import Optional
 import joblib
 
+from src.data_io import ARTIFACT_SUFFIX, DEFAULT_CHUNKSIZE, TableWriter, iter_table, read_columns
+from src.features.encoding import build_feature_matrix
+
 # ============================================================
 # Configuration
 # ============================================================
 
-FEATURES_PATH = Path("data/processed/model_features_final.csv")
+FEATURES_PATH = Path(f"data/processed/model_features_final{ARTIFACT_SUFFIX}")
 MODEL_PATH = Path("models/baseline_model.pkl")
-OUTPUT_PATH = Path("data/processed/baseline_predictions.csv")
+OUTPUT_PATH = Path(f"data/processed/baseline_predictions{ARTIFACT_SUFFIX}")
 
 DATE_COL = "DATE"
 TARGET_COL = "TOTAL_PRODUCT_DEMAND"
@@ -42,22 +46,55 @@ def log(msg: str):
     print(f"🔹 {msg}")
 
 # ============================================================
-# Main Prediction Logic
+# Chunk Prediction
 # ============================================================
 
-def main():
-    log("Starting baseline prediction generation")
+def predict_chunk(
+    df: pd.DataFrame,
+    model,
+    num_cols: list,
+    cat_cols: list,
+    categories: dict,
+) -> dict:
+    """
+    Encode one chunk of features and return its prediction columns.
 
-    # --------------------------------------------------------
-    # Load feature dataset
-    # --------------------------------------------------------
+    Columns are returned as arrays rather than a new DataFrame so the
+    writer can hand them to Arrow without another copy.
+    """
+
+    X_final = build_feature_matrix(df, num_cols, cat_cols, categories)
+
+    y_pred = model.predict(X_final)
 
-    log("Loading feature dataset")
-    df = pd.read_csv(FEATURES_PATH, parse_dates=[DATE_COL])
-    df = df.sort_values(DATE_COL).reset_index(drop=True)
+    if TARGET_COL in df.columns:
+        actual = df[TARGET_COL].to_numpy()
+    else:
+        actual = np.full(len(df), np.nan)
+
+    return {
+        "DATE": df[DATE_COL].to_numpy(),
+        "COUNTRY": df["COUNTRY"].to_numpy(),
+        "ACTUAL_DEMAND": actual,
+        "BASELINE_PREDICTION": y_pred
+    }
+
+# ============================================================
+# Main Prediction Logic
+# ============================================================
+
+def main(
+    features_path: Path = FEATURES_PATH,
+    model_path: Path = MODEL_PATH,
+    output_path: Path = OUTPUT_PATH,
+    country: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+):
+    log("Starting baseline prediction generation")
 
-    log(f"Dataset loaded with shape: {df.shape}")
-    log(f"Date range: {df[DATE_COL].min()} → {df[DATE_COL].max()}")
+    features_path = Path(features_path)
+    model_path = Path(model_path)
+    output_path = Path(output_path)
 
     # --------------------------------------------------------
     # Load trained model artifact
@@ -65,26 +102,36 @@ def main():
 
     log("Loading trained baseline model artifact")
 
-    artifact = joblib.load(MODEL_PATH)
+    artifact = joblib.load(model_path)
 
     model = artifact["model"]
-    encoder = artifact["encoder"]
     num_cols = artifact["numeric_features"]
     cat_cols = artifact["categorical_features"]
 
-    log("Model and encoder loaded successfully")
+    if "categories" not in artifact:
+        raise ValueError(
+            f"Model artifact {model_path} has no categorical dtypes "
+            f"(pre category-code format). Re-run final model training."
+        )
+
+    categories = artifact["categories"]
+
+    log("Model and category mappings loaded successfully")
     log(f"Numeric features: {len(num_cols)}")
     log(f"Categorical features: {cat_cols}")
 
+    if country is not None:
+        log(f"Restricted to country: {country}")
+
     # --------------------------------------------------------
-    # Prepare feature matrix
+    # Resolve the columns to read
     # --------------------------------------------------------
 
-    X = df.drop(columns=[DATE_COL, TARGET_COL], errors="ignore")
+    # Safety check against the file schema, before any rows are read
+    available = set(read_columns(features_path))
 
-    # Safety check
-    missing_num = set(num_cols) - set(X.columns)
-    missing_cat = set(cat_cols) - set(X.columns)
+    missing_num = set(num_cols) - available
+    missing_cat = set(cat_cols) - available
 
     if missing_num or missing_cat:
         raise ValueError(
@@ -93,42 +140,44 @@ def main():
             f"Missing categorical: {missing_cat}"
         )
 
-    log("Encoding categorical features using trained encoder")
-
-    X_num = X[num_cols].values
-    X_cat = encoder.transform(X[cat_cols])
-
-    X_final = np.hstack([X_num, X_cat])
-
-    log(f"Final feature matrix shape: {X_final.shape}")
+    # Project to the model inputs + output keys; any other columns in the
+    # features file are never parsed
+    optional = [TARGET_COL] if TARGET_COL in available else []
+    columns = list(dict.fromkeys([DATE_COL, "COUNTRY", *num_cols, *cat_cols, *optional]))
 
     # --------------------------------------------------------
-    # Generate predictions
+    # Stream features → predictions
     # --------------------------------------------------------
 
-    log("Generating baseline demand predictions")
+    # Peak memory is bounded by `chunksize` rows, not the full history
+    log(f"Streaming feature dataset in chunks of {chunksize:,} rows")
 
-    y_pred = model.predict(X_final)
+    date_min, date_max = None, None
 
-    # --------------------------------------------------------
-    # Assemble output dataframe
-    # --------------------------------------------------------
+    with TableWriter(output_path) as writer:
+        for df in iter_table(
+            features_path, chunksize=chunksize, parse_dates=[DATE_COL], columns=columns
+        ):
+            if country is not None:
+                df = df[df["COUNTRY"] == country]
 
-    output_df = pd.DataFrame({
-        "DATE": df[DATE_COL],
-        "COUNTRY": df["COUNTRY"],
-        "ACTUAL_DEMAND": df[TARGET_COL] if TARGET_COL in df.columns else np.nan,
-        "BASELINE_PREDICTION": y_pred
-    })
+            if df.empty:
+                continue
 
-    # --------------------------------------------------------
-    # Persist predictions
-    # --------------------------------------------------------
+            writer.write(predict_chunk(df, model, num_cols, cat_cols, categories))
+
+            chunk_min, chunk_max = df[DATE_COL].min(), df[DATE_COL].max()
+            date_min = chunk_min if date_min is None else min(date_min, chunk_min)
+            date_max = chunk_max if date_max is None else max(date_max, chunk_max)
+
+        rows_written = writer.rows_written
 
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    output_df.to_csv(OUTPUT_PATH, index=False)
+    if rows_written == 0:
+        raise ValueError(f"No feature rows to predict in {features_path}")
 
-    log(f"Predictions saved to: {OUTPUT_PATH}")
+    log(f"Predicted {rows_written:,} rows")
+    log(f"Date range: {date_min} → {date_max}")
+    log(f"Predictions saved to: {output_path}")
     log("Baseline prediction generation completed successfully")
 
 # ============================================================
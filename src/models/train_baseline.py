@@ -4,7 +4,7 @@ Baseline Demand Forecasting Model (TimeSeries-safe)
 
 Fixes:
 - Handles categorical features (COUNTRY)
-- Uses OneHotEncoding
+- Integer category codes + native categorical support of HistGradientBoosting
 - Prevents data leakage
 """
 
@@ -15,169 +15,227 @@ Fixes:
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from joblib import Memory
 
 from sklearn.model_selection import TimeSeriesSplit
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.metrics import mean_absolute_error
-from sklearn.preprocessing import OneHotEncoder
+
+from src.data_io import ARTIFACT_SUFFIX, read_table, write_table
+from src.features.encoding import build_feature_matrix, categorical_indices, fit_categories
 
 # ============================================================
 # Config
 # ============================================================
 
-DATA_PATH = Path("data/processed/model_features_final.csv")
-OUTPUT_PATH = Path("data/processed/baseline_cv_results.csv")
+DATA_PATH = Path(f"data/processed/model_features_final{ARTIFACT_SUFFIX}")
+OUTPUT_PATH = Path(f"data/processed/baseline_cv_results{ARTIFACT_SUFFIX}")
 
 TARGET_COL = "TOTAL_PRODUCT_DEMAND"
-CATEGORICAL_COLS = ["COUNTRY"]
+# Set, so splitting wide schemas into cat/num is O(1) per column
+CATEGORICAL_COLS = frozenset({"COUNTRY"})
 
 N_SPLITS = 5
 RANDOM_STATE = 42
 
+# Fold fits are memoised here, keyed on the training data + params
+CACHE_DIR = Path("cache/baseline_cv")
+
+# Shared with train_final_baseline so the final model is the one that was
+# cross-validated
+MODEL_PARAMS = {
+    "max_iter": 300,
+    "max_depth": 8,
+    "min_samples_leaf": 10,
+    "learning_rate": 0.05,
+    "early_stopping": True,
+    "validation_fraction": 0.1,
+    # Stop once the held-out loss has stalled for 5 rounds; boosting keeps
+    # the stalled rounds, so a shorter patience also trims the model
+    "n_iter_no_change": 5,
+    "tol": 1e-4,
+    "random_state": RANDOM_STATE,
+}
+
 # ============================================================
 # Metrics
 # ============================================================
 
 def wape(y_true, y_pred):
-    return np.sum(np.abs(y_true - y_pred)) / np.sum(np.abs(y_true))
-
+    yt = np.asarray(y_true, dtype=np.float32)
+    yp = np.asarray(y_pred, dtype=np.float32)
 
-# ============================================================
-# Load data
-# ============================================================
+    # Reuse one buffer for the residuals instead of two temporaries
+    abs_err = np.subtract(yt, yp)
+    np.abs(abs_err, out=abs_err)
 
-print("📥 Loading feature dataset...")
+    return float(abs_err.sum() / np.abs(yt).sum())
 
-df = pd.read_csv(DATA_PATH, parse_dates=["DATE"])
-df = df.sort_values("DATE").reset_index(drop=True)
-
-print(f"✅ Dataset loaded: {df.shape}")
-print(f"📅 Date range: {df['DATE'].min()} → {df['DATE'].max()}")
 
 # ============================================================
-# Split features / target
+# Model Fit
 # ============================================================
 
-X = df.drop(columns=["DATE", TARGET_COL])
-y = df[TARGET_COL]
+def fit_model(X_train: np.ndarray, y_train: np.ndarray, params: dict) -> HistGradientBoostingRegressor:
+    """Fit a single fold's model (pure function of its inputs, so cacheable)"""
+    model = HistGradientBoostingRegressor(**params)
+    return model.fit(X_train, y_train)
 
-print(f"🧮 Initial features: {X.shape[1]}")
-print(f"🎯 Target: {TARGET_COL}")
 
 # ============================================================
-# Identify categorical + numeric features
+# Cross-Validation
 # ============================================================
 
-cat_cols = [c for c in CATEGORICAL_COLS if c in X.columns]
-num_cols = [c for c in X.columns if c not in cat_cols]
+def main(
+    data_path: Path = DATA_PATH,
+    output_path: Path = OUTPUT_PATH,
+    use_cache: bool = True,
+) -> pd.DataFrame:
 
-print(f"🔤 Categorical columns: {cat_cols}")
-print(f"🔢 Numeric columns: {len(num_cols)}")
+    data_path = Path(data_path)
+    output_path = Path(output_path)
 
-# ============================================================
-# TimeSeries Cross Validation
-# ============================================================
+    # Unchanged features + params re-use the previous fold fits
+    fit = Memory(CACHE_DIR, verbose=0).cache(fit_model) if use_cache else fit_model
+
+    # --------------------------------------------------------
+    # Load data
+    # --------------------------------------------------------
 
-tscv = TimeSeriesSplit(n_splits=N_SPLITS)
-results = []
+    print("📥 Loading feature dataset...")
 
-print(f"\n🔁 Running TimeSeriesSplit CV ({N_SPLITS} folds)\n")
+    df = read_table(data_path, parse_dates=["DATE"])
 
-for fold, (train_idx, test_idx) in enumerate(tscv.split(X), start=1):
+    # Feature engineering writes date-ordered rows; verify instead of re-sorting
+    if not df["DATE"].is_monotonic_increasing:
+        raise ValueError(
+            f"{data_path} is not sorted by DATE. Re-run feature engineering."
+        )
 
-    print(f"================ Fold {fold} ================")
+    print(f"✅ Dataset loaded: {df.shape}")
+    print(f"📅 Date range: {df['DATE'].min()} → {df['DATE'].max()}")
 
-    X_train_raw = X.iloc[train_idx]
-    X_test_raw = X.iloc[test_idx]
+    # --------------------------------------------------------
+    # Split features / target
+    # --------------------------------------------------------
 
-    y_train = y.iloc[train_idx]
-    y_test = y.iloc[test_idx]
+    # Feature columns are selected by name from `df` — no drop() copy
+    feature_cols = [c for c in df.columns if c not in ("DATE", TARGET_COL)]
 
-    print(f"Train range: {df.iloc[train_idx]['DATE'].min()} → {df.iloc[train_idx]['DATE'].max()}")
-    print(f"Test  range: {df.iloc[test_idx]['DATE'].min()} → {df.iloc[test_idx]['DATE'].max()}")
+    print(f"🧮 Initial features: {len(feature_cols)}")
+    print(f"🎯 Target: {TARGET_COL}")
 
     # --------------------------------------------------------
-    # Encode categorical variables (fit ONLY on train)
+    # Identify categorical + numeric features
     # --------------------------------------------------------
 
-    try:
-        encoder = OneHotEncoder(
-            handle_unknown="ignore",
-            sparse_output=False
-        )
-    except TypeError:
-        # Fallback for older sklearn versions
-        encoder = OneHotEncoder(
-            handle_unknown="ignore",
-            sparse=False
-        )
+    # Set lookups; both lists follow the schema's column order
+    cat_cols = [c for c in feature_cols if c in CATEGORICAL_COLS]
+    num_cols = [c for c in feature_cols if c not in CATEGORICAL_COLS]
 
+    print(f"🔤 Categorical columns: {cat_cols}")
+    print(f"🔢 Numeric columns: {len(num_cols)}")
 
-    X_train_cat = encoder.fit_transform(X_train_raw[cat_cols])
-    X_test_cat = encoder.transform(X_test_raw[cat_cols])
+    # Category codes are appended after the numeric block
+    params = {
+        **MODEL_PARAMS,
+        "categorical_features": categorical_indices(num_cols, cat_cols),
+    }
 
     # --------------------------------------------------------
-    # Combine numeric + encoded categorical
+    # Encode once; folds take contiguous slices (views, no copies)
     # --------------------------------------------------------
 
-    X_train_num = X_train_raw[num_cols].values
-    X_test_num = X_test_raw[num_cols].values
+    # Codes are only labels: HGBT learns categories from the training
+    # slice alone and treats ones unseen there as missing at predict
+    # time, so encoding on the full history leaks nothing
+    categories = fit_categories(df, cat_cols)
 
-    X_train_final = np.hstack([X_train_num, X_train_cat])
-    X_test_final = np.hstack([X_test_num, X_test_cat])
+    X_np = build_feature_matrix(df, num_cols, cat_cols, categories)
+    y_np = df[TARGET_COL].to_numpy(dtype=np.float64)
+    dates = df["DATE"]
 
-    print(f"Final train shape: {X_train_final.shape}")
-    print(f"Final test  shape: {X_test_final.shape}")
+    # X_np / y_np now hold everything the folds need; release the frame
+    # so the dataset is resident once during CV
+    del df
 
     # --------------------------------------------------------
-    # Model
+    # TimeSeries Cross Validation
     # --------------------------------------------------------
 
-    model = RandomForestRegressor(
-        n_estimators=200,
-        max_depth=10,
-        min_samples_leaf=10,
-        random_state=RANDOM_STATE,
-        n_jobs=-1
-    )
+    tscv = TimeSeriesSplit(n_splits=N_SPLITS)
+    results = []
 
-    # --------------------------------------------------------
-    # Train
-    # --------------------------------------------------------
+    print(f"\n🔁 Running TimeSeriesSplit CV ({N_SPLITS} folds)\n")
 
-    model.fit(X_train_final, y_train)
+    for fold, (train_idx, test_idx) in enumerate(tscv.split(X_np), start=1):
 
-    # --------------------------------------------------------
-    # Predict
-    # --------------------------------------------------------
+        print(f"================ Fold {fold} ================")
+
+        # TimeSeriesSplit folds are contiguous index ranges
+        train_slice = slice(train_idx[0], train_idx[-1] + 1)
+        test_slice = slice(test_idx[0], test_idx[-1] + 1)
+
+        X_train_final = X_np[train_slice]
+        X_test_final = X_np[test_slice]
+
+        y_train = y_np[train_slice]
+        y_test = y_np[test_slice]
+
+        # Rows are date-ordered, so the range is first → last row
+        print(f"Train range: {dates.iloc[train_slice.start]} → {dates.iloc[train_slice.stop - 1]}")
+        print(f"Test  range: {dates.iloc[test_slice.start]} → {dates.iloc[test_slice.stop - 1]}")
+
+        print(f"Final train shape: {X_train_final.shape}")
+        print(f"Final test  shape: {X_test_final.shape}")
+
+        # ----------------------------------------------------
+        # Train
+        # ----------------------------------------------------
+
+        model = fit(X_train_final, y_train, params)
 
-    y_pred = model.predict(X_test_final)
+        # ----------------------------------------------------
+        # Predict
+        # ----------------------------------------------------
+
+        y_pred = model.predict(X_test_final)
+
+        # ----------------------------------------------------
+        # Metrics
+        # ----------------------------------------------------
+
+        fold_mae = mean_absolute_error(y_test, y_pred)
+        fold_wape = wape(y_test, y_pred)
+
+        print(f"MAE  : {fold_mae:,.2f}")
+        print(f"WAPE : {fold_wape:.2%}")
+
+        results.append({
+            "fold": fold,
+            "mae": fold_mae,
+            "wape": fold_wape
+        })
 
     # --------------------------------------------------------
-    # Metrics
+    # Save results
     # --------------------------------------------------------
 
-    fold_mae = mean_absolute_error(y_test, y_pred)
-    fold_wape = wape(y_test.values, y_pred)
+    results_df = pd.DataFrame(results)
+    write_table(results_df, output_path)
 
-    print(f"MAE  : {fold_mae:,.2f}")
-    print(f"WAPE : {fold_wape:.2%}")
+    print("\n📊 Cross-validation summary")
+    print(results_df.describe())
 
-    results.append({
-        "fold": fold,
-        "mae": fold_mae,
-        "wape": fold_wape
-    })
+    print(f"\n💾 Results saved to: {output_path}")
+    print("\n✅ Baseline training completed successfully")
 
-# ============================================================
-# Save results
-# ============================================================
+    return results_df
 
-results_df = pd.DataFrame(results)
-results_df.to_csv(OUTPUT_PATH, index=False)
 
-print("\n📊 Cross-validation summary")
-print(results_df.describe())
+# ============================================================
+# CLI Entrypoint
+# ============================================================
 
-print(f"\n💾 Results saved to: {OUTPUT_PATH}")
-print("\n✅ Baseline training completed successfully")
+if __name__ == "__main__":
+    main()
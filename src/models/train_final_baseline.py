@@ -18,26 +18,43 @@ Design principles:
 # Imports
 # ============================================================
 
+import argparse
+import hashlib
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from typing import Optional, Tuple
 import joblib
 
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import OneHotEncoder
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+from src.data_io import ARTIFACT_SUFFIX, read_arrow
+from src.features.encoding import build_table_feature_matrix, categorical_indices, fit_table_categories
+from src.models.train_baseline import MODEL_PARAMS
 
 # ============================================================
 # Configuration
 # ============================================================
 
-FEATURES_PATH = Path("data/processed/model_features_final.csv")
+FEATURES_PATH = Path(f"data/processed/model_features_final{ARTIFACT_SUFFIX}")
 MODEL_OUTPUT_PATH = Path("models/baseline_model.pkl")
 
 DATE_COL = "DATE"
 TARGET_COL = "TOTAL_PRODUCT_DEMAND"
-CATEGORICAL_COLS = ["COUNTRY"]
+# Set, so splitting wide schemas into cat/num is O(1) per column
+CATEGORICAL_COLS = frozenset({"COUNTRY"})
+
+# zlib ships with Python (no extra dependency in the pipeline image) and
+# roughly halves the artifact; joblib.load detects it transparently
+MODEL_COMPRESSION = ("zlib", 3)
+
+# Encoded design matrices, keyed on the features file they came from
+CACHE_DIR = Path("cache/final_features")
+CACHE_KEY_BYTES = 1 << 20
 
-RANDOM_STATE = 42
+# Bump whenever build_design_matrix / src.features.encoding change how
+# columns are encoded, so warm runs never reuse a stale matrix
+ENCODING_VERSION = 1
 
 # ============================================================
 # Utility Logging
@@ -47,40 +64,56 @@ def log(msg: str):
     print(f"🔹 {msg}")
 
 # ============================================================
-# Main Training Logic
+# Design Matrix
 # ============================================================
 
-def main():
-    log("Starting FINAL baseline model training")
+def build_design_matrix(features_path: Path) -> Tuple[np.ndarray, np.ndarray, dict]:
+    """
+    Load, date-sort and encode the feature dataset.
+
+    Returns X_final, y and the encoding metadata persisted with the model.
+    """
 
     # --------------------------------------------------------
     # Load feature dataset
     # --------------------------------------------------------
 
     log("Loading feature dataset")
-    df = pd.read_csv(FEATURES_PATH, parse_dates=[DATE_COL])
+    table = read_arrow(features_path, parse_dates=[DATE_COL])
 
-    df = df.sort_values(DATE_COL).reset_index(drop=True)
+    # Feature engineering already writes rows in date order, so usually a
+    # single O(n) scan replaces the sort. Otherwise sort in Arrow
+    # (stable, multithreaded)
+    ts = table[DATE_COL].to_numpy()
 
-    log(f"Dataset loaded with shape: {df.shape}")
-    log(f"Date range: {df[DATE_COL].min()} → {df[DATE_COL].max()}")
+    if not (ts[1:] >= ts[:-1]).all():
+        log("Feature dataset is not date-ordered; sorting")
+        table = table.sort_by(DATE_COL)
+        ts = table[DATE_COL].to_numpy()
+
+    log(f"Dataset loaded with shape: {table.shape}")
+    log(f"Date range: {pd.Timestamp(ts[0])} → {pd.Timestamp(ts[-1])}")
 
     # --------------------------------------------------------
     # Split features & target
     # --------------------------------------------------------
 
-    X = df.drop(columns=[DATE_COL, TARGET_COL])
-    y = df[TARGET_COL]
+    # The design matrix is built straight from Arrow columns — the data
+    # never passes through a pandas DataFrame
+    feature_cols = [c for c in table.column_names if c not in (DATE_COL, TARGET_COL)]
+    # Y_DTYPE of HGBT is float64; convert once here rather than inside fit
+    y = table[TARGET_COL].to_numpy().astype(np.float64, copy=False)
 
-    log(f"Total features: {X.shape[1]}")
+    log(f"Total features: {len(feature_cols)}")
     log(f"Target column: {TARGET_COL}")
 
     # --------------------------------------------------------
     # Identify categorical vs numeric features
     # --------------------------------------------------------
 
-    cat_cols = [c for c in CATEGORICAL_COLS if c in X.columns]
-    num_cols = [c for c in X.columns if c not in cat_cols]
+    # Set lookups; both lists follow the schema's column order
+    cat_cols = [c for c in feature_cols if c in CATEGORICAL_COLS]
+    num_cols = [c for c in feature_cols if c not in CATEGORICAL_COLS]
 
     log(f"Categorical columns: {cat_cols}")
     log(f"Numeric columns: {len(num_cols)}")
@@ -91,22 +124,104 @@ def main():
 
     log("Encoding categorical features")
 
-    try:
-        encoder = OneHotEncoder(
-            handle_unknown="ignore",
-            sparse_output=False
-        )
-    except TypeError:
-        # Backward compatibility for older sklearn
-        encoder = OneHotEncoder(
-            handle_unknown="ignore",
-            sparse=False
-        )
+    categories = fit_table_categories(table, cat_cols)
+
+    # X_final is float64 (HGBT's X_DTYPE) and is binned to uint8 inside
+    # fit — a float32 matrix would only be upcast again
+    X_final = build_table_feature_matrix(table, num_cols, cat_cols, categories)
+
+    meta = {
+        "categories": categories,
+        "numeric_features": num_cols,
+        "categorical_features": cat_cols,
+    }
+
+    return X_final, y, meta
+
+# ============================================================
+# Design Matrix Cache
+# ============================================================
+
+def feature_cache_key(features_path: Path) -> str:
+    """
+    Fingerprint the features file (leading bytes + size + mtime) together
+    with the encoding schema and version it is encoded under.
+    """
+    stat = features_path.stat()
+
+    digest = hashlib.sha1()
+    with open(features_path, "rb") as f:
+        digest.update(f.read(CACHE_KEY_BYTES))
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    schema = (ENCODING_VERSION, DATE_COL, TARGET_COL, sorted(CATEGORICAL_COLS))
+    digest.update(repr(schema).encode())
+
+    return digest.hexdigest()
+
+
+def load_cached_design_matrix(key: str) -> Optional[Tuple[np.ndarray, np.ndarray, dict]]:
+    """Memory-map a cached X_final / y, or None on a cache miss"""
+    meta_path = CACHE_DIR / f"{key}.pkl"
+
+    # The metadata is written last, so it marks a complete entry
+    if not meta_path.exists():
+        return None
+
+    X_final = np.load(CACHE_DIR / f"{key}_X.npy", mmap_mode="r")
+    y = np.load(CACHE_DIR / f"{key}_y.npy", mmap_mode="r")
 
-    X_cat = encoder.fit_transform(X[cat_cols])
-    X_num = X[num_cols].values
+    return X_final, y, joblib.load(meta_path)
 
-    X_final = np.hstack([X_num, X_cat])
+
+def save_design_matrix(key: str, X_final: np.ndarray, y: np.ndarray, meta: dict):
+    """Store X_final / y under `key`, replacing any previous entry"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Keep a single entry: each one is a full float64 copy of X
+    for stale in CACHE_DIR.iterdir():
+        if stale.is_file():
+            stale.unlink()
+
+    np.save(CACHE_DIR / f"{key}_X.npy", X_final)
+    np.save(CACHE_DIR / f"{key}_y.npy", y)
+    joblib.dump(meta, CACHE_DIR / f"{key}.pkl")
+
+# ============================================================
+# Main Training Logic
+# ============================================================
+
+def main(
+    features_path: Path = FEATURES_PATH,
+    model_output_path: Path = MODEL_OUTPUT_PATH,
+    use_cache: bool = True,
+):
+    log("Starting FINAL baseline model training")
+
+    features_path = Path(features_path)
+    model_output_path = Path(model_output_path)
+
+    # --------------------------------------------------------
+    # Build (or reuse) the encoded design matrix
+    # --------------------------------------------------------
+
+    cached = None
+
+    if use_cache:
+        key = feature_cache_key(features_path)
+        cached = load_cached_design_matrix(key)
+
+    if cached is not None:
+        log(f"Reusing cached design matrix: {CACHE_DIR / key}")
+        X_final, y, meta = cached
+    else:
+        X_final, y, meta = build_design_matrix(features_path)
+
+        if use_cache:
+            save_design_matrix(key, X_final, y, meta)
+
+    num_cols = meta["numeric_features"]
+    cat_cols = meta["categorical_features"]
 
     log(f"Final feature matrix shape: {X_final.shape}")
 
@@ -114,14 +229,12 @@ def main():
     # Train final baseline model
     # --------------------------------------------------------
 
-    log("Training RandomForest baseline model")
+    log("Training HistGradientBoosting baseline model")
 
-    model = RandomForestRegressor(
-        n_estimators=300,
-        max_depth=12,
-        min_samples_leaf=10,
-        random_state=RANDOM_STATE,
-        n_jobs=-1
+    # Category codes sit after the numeric block in X_final
+    model = HistGradientBoostingRegressor(
+        **MODEL_PARAMS,
+        categorical_features=categorical_indices(num_cols, cat_cols),
     )
 
     model.fit(X_final, y)
@@ -132,19 +245,16 @@ def main():
     # Persist model artifact
     # --------------------------------------------------------
 
-    MODEL_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    model_output_path.parent.mkdir(parents=True, exist_ok=True)
 
     joblib.dump(
-        {
-            "model": model,
-            "encoder": encoder,
-            "numeric_features": num_cols,
-            "categorical_features": cat_cols,
-        },
-        MODEL_OUTPUT_PATH
+        {"model": model, **meta},
+        model_output_path,
+        compress=MODEL_COMPRESSION,
+        protocol=5,
     )
 
-    log(f"Model artifact saved to: {MODEL_OUTPUT_PATH}")
+    log(f"Model artifact saved to: {model_output_path}")
     log("FINAL baseline model is ready for prediction & impact analysis")
 
 # ============================================================
@@ -152,4 +262,12 @@ def main():
 # ============================================================
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Train the final baseline model")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rebuild the encoded design matrix instead of reusing the cache",
+    )
+    args = parser.parse_args()
+
+    main(use_cache=not args.no_cache)